@@ -1,7 +1,11 @@
+import functools
 import logging
+import math
 from typing import Annotated, Optional
 
+import qt
 import vtk
+from vtk.util.numpy_support import numpy_to_vtk, get_vtk_array_type
 
 import slicer
 from slicer.i18n import tr as _
@@ -18,11 +22,79 @@ from slicer import vtkMRMLMarkupsROINode, vtkMRMLLabelMapVolumeNode
 from slicer import vtkMRMLSequenceNode, vtkMRMLSegmentationNode, vtkMRMLTableNode
 
 import numpy as np
-from scipy import signal
 import pydicom as pydcm
 
 import time
 
+# Contrast Bolus Start Time is recorded in different Dicom attributes,
+# depending on the manufacturer and sequence, so far, the following are known:
+# Philips - Dyn eThrive: (0018, 1042) ContrastBolusStartTime
+CONTRAST_BOLUS_ATTRIBUTES = ('ContrastBolusStartTime',)
+
+# Ratio between the volume of an ellipsoid and the volume of its enclosing box, i.e. (0.5)^3 * (4pi/3) (or simply pi/6.0)
+ELLIPSOID_SCALE = (1.0/6.0) * math.pi
+
+# Custom layout with the Red and Yellow slice views on top, and the plot and table views below.
+# Customise the layout before starting (https://slicer.readthedocs.io/en/latest/developer_guide/script_repository.html#customize-view-layout)
+# To get more help, check the code: https://github.com/Slicer/Slicer/blob/main/Libs/MRML/Logic/vtkMRMLLayoutLogic.cxx
+CUSTOM_LAYOUT = """
+<layout type="vertical" split="true" >
+<item splitSize="500">
+    <layout type="vertical">
+    <item>
+        <layout type="horizontal">
+            <item>
+                <view class="vtkMRMLSliceNode" singletontag="Red">
+                <property name="orientation" action="default">Axial</property>
+                <property name="viewlabel" action="default">R</property>
+                <property name="viewcolor" action="default">#F34A33</property>
+                </view>
+            </item>
+            <item>
+                <view class="vtkMRMLSliceNode" singletontag="Yellow">
+                <property name="orientation" action="default">Sagittal</property>
+                <property name="viewlabel" action="default">Y</property>
+                <property name="viewcolor" action="default">#EDD54C</property>
+                </view>
+            </item>
+        </layout>
+    </item>
+    </layout>
+</item>
+<item splitSize="300">
+    <layout type="vertical">
+    <item>
+        <layout type="horizontal">
+            <item>
+                <view class="vtkMRMLPlotViewNode" singletontag="PlotView1">
+                <property name="viewlabel" action="default">P</property>
+                </view>
+            </item>
+            <item>
+                <view class="vtkMRMLTableViewNode" singletontag="TableView1">
+                <property name="viewlabel" action="default">T</property>
+                </view>
+            </item>
+        </layout>
+    </item>
+    </layout>
+</item>
+</layout>
+"""
+
+
+@functools.lru_cache(maxsize=8)
+def _defaultTimeAxis(nt: int) -> np.ndarray:
+    """
+    Time axis used when the sequence has no acquisition times (MultiVolume.FrameLabels).
+    The time axis is normalised to nt = 1min = 60x10e3 [ms] to be consistent with the calculations.
+    The array is shared between callers, so it is made read-only.
+    """
+    timeAxis = np.linspace(0, nt*60.0*1.0e3, num=nt, endpoint=True)
+    timeAxis.flags.writeable = False
+
+    return timeAxis
+
 #
 # quantification
 #
@@ -165,55 +237,15 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         self.logic = None
         self._parameterNode = None
         self._parameterNodeGuiTag = None
-        
-        # Setting up the display
-        # Customise the layout before starting (https://slicer.readthedocs.io/en/latest/developer_guide/script_repository.html#customize-view-layout)
-        # To get more help, check the code: https://github.com/Slicer/Slicer/blob/main/Libs/MRML/Logic/vtkMRMLLayoutLogic.cxx
-        customLayout = """
-        <layout type="vertical" split="true" >
-        <item splitSize="500">
-            <layout type="vertical">
-            <item>
-                <layout type="horizontal">
-                    <item>
-                        <view class="vtkMRMLSliceNode" singletontag="Red">
-                        <property name="orientation" action="default">Axial</property>
-                        <property name="viewlabel" action="default">R</property>
-                        <property name="viewcolor" action="default">#F34A33</property>
-                        </view>
-                    </item>
-                    <item>
-                        <view class="vtkMRMLSliceNode" singletontag="Yellow">
-                        <property name="orientation" action="default">Sagittal</property>
-                        <property name="viewlabel" action="default">Y</property>
-                        <property name="viewcolor" action="default">#EDD54C</property>
-                        </view>
-                    </item>
-                </layout>
-            </item>
-            </layout>
-        </item>
-        <item splitSize="300">
-            <layout type="vertical">
-            <item>
-                <layout type="horizontal">
-                    <item>
-                        <view class="vtkMRMLPlotViewNode" singletontag="PlotView1">
-                        <property name="viewlabel" action="default">P</property>
-                        </view>
-                    </item>
-                    <item>
-                        <view class="vtkMRMLTableViewNode" singletontag="TableView1">
-                        <property name="viewlabel" action="default">T</property>
-                        </view>
-                    </item>
-                </layout>
-            </item>
-            </layout>
-        </item>
-        </layout>
-        """
 
+        # JU - The parameter node is modified several times during a single user action (e.g. while dragging a slider),
+        # so its changes are coalesced into a single _checkCanApply call, run once the event loop is idle
+        self._checkCanApplyTimer = qt.QTimer()
+        self._checkCanApplyTimer.setSingleShot(True)
+        self._checkCanApplyTimer.setInterval(0)
+        self._checkCanApplyTimer.connect('timeout()', self._checkCanApply)
+        
+        # Setting up the display (see CUSTOM_LAYOUT)
         # Built-in layout IDs are all below 100, so we can choose any large random number
         # for your custom layout ID.
         self.customLayoutId=990
@@ -224,8 +256,10 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         # JU - Setting up a layout manager object
         self.layoutManager = slicer.app.layoutManager()
 
-        # Add the custom layout:
-        self.layoutManager.layoutLogic().GetLayoutNode().AddLayoutDescription(self.customLayoutId, customLayout)
+        # Add the custom layout (only once, the layout node keeps it when the module widget is re-created):
+        layoutNode = self.layoutManager.layoutLogic().GetLayoutNode()
+        if not layoutNode.IsLayoutDescription(self.customLayoutId):
+            layoutNode.AddLayoutDescription(self.customLayoutId, CUSTOM_LAYOUT)
 
         # JU - Switch to a layout that contains a plot view to create a plot widget.
         # 38 is the layout called "Four-up Quantitative" in the layout dropdown list 
@@ -235,23 +269,24 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         self.layoutManager.setLayout(self.customLayoutId)
 
         # Ensure the markers are visible in all the views:
-        viewNodes = slicer.util.getNodesByClass("vtkMRMLAbstractViewNode")
+        # (the scene collections are walked directly, no need to build intermediate python lists)
+        viewNodes = slicer.mrmlScene.GetNodesByClass("vtkMRMLAbstractViewNode")
 
-        for viewNode in viewNodes:
-            viewNode.SetOrientationMarkerType(slicer.vtkMRMLAbstractViewNode.OrientationMarkerTypeAxes)
+        for idx in range(viewNodes.GetNumberOfItems()):
+            viewNodes.GetItemAsObject(idx).SetOrientationMarkerType(slicer.vtkMRMLAbstractViewNode.OrientationMarkerTypeAxes)
 
         # Display the slice intersections:
-        sliceDisplayNodes = slicer.util.getNodesByClass("vtkMRMLSliceDisplayNode")
+        sliceDisplayNodes = slicer.mrmlScene.GetNodesByClass("vtkMRMLSliceDisplayNode")
 
-        for sliceDisplayNode in sliceDisplayNodes:
-            sliceDisplayNode.SetIntersectingSlicesVisibility(1)
+        for idx in range(sliceDisplayNodes.GetNumberOfItems()):
+            sliceDisplayNodes.GetItemAsObject(idx).SetIntersectingSlicesVisibility(1)
 
         # JU - End setting up the layout and display
         
         # JU - To ensure the columns name are consisten between TICTable and TICplot, I define them here:
-        self.TICTableRowNames = ["Timepoint [min]", "PE (%)", "Linear Fit"]
-        self.SummaryTableRowNames = ["Parameter", "Value", "Units"]
-        self.SERTableRowNames = ["SER Range", "Volume (cm3)", "Distribution (%)"]
+        self.TICTableRowNames = ("Timepoint [min]", "PE (%)", "Linear Fit")
+        self.SummaryTableRowNames = ("Parameter", "Value", "Units")
+        self.SERTableRowNames = ("SER Range", "Volume (cm3)", "Distribution (%)")
 
         # JU - Auxiliar nodes and variables
         self.currentVolume = None
@@ -260,6 +295,8 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         self.segmentID = None
         self.colourTableNode = None
         self.timeFrames = None
+        # Bolus injection time of the last input sequence, as (sequence ID, frame file list, time) (see getAcquisitionTimings)
+        self._bolusTimeCache = None
         self.serMapInterval = None
         # Anything above SER_UPPER_THRESHOLD will be considered NON-SER (together with negative values). 
         # This is to be consistent with FTVDCEMRI and Aegis, where everything above 3.0 is not considered.
@@ -335,6 +372,13 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         self.ui.indexSliderEarlyPostContrast.connect("valueChanged(double)", self.setCurrentVolumeFromIndex)
         self.ui.indexSliderLatePostContrast.connect("valueChanged(double)", self.setCurrentVolumeFromIndex)
 
+        # JU - Widgets whose range depends on the number of items in the input sequence (see setMaxIndexSelector):
+        self._indexSliderWidgets = [self.ui.indexSliderPreContrast,
+                                    self.ui.indexSliderEarlyPostContrast,
+                                    self.ui.indexSliderLatePostContrast,
+                                    self.ui.minuendIndexSelector,
+                                    self.ui.subtrahendIndexSelector]
+
         # These connections ensure that we update parameter node when scene is closed
         self.addObserver(slicer.mrmlScene, slicer.mrmlScene.StartCloseEvent, self.onSceneStartClose)
         self.addObserver(slicer.mrmlScene, slicer.mrmlScene.EndCloseEvent, self.onSceneEndClose)
@@ -364,6 +408,7 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
     def cleanup(self) -> None:
         """Called when the application closes and the module widget is destroyed."""
         
+        self._checkCanApplyTimer.stop()
         self.removeObservers()
 
 
@@ -381,7 +426,8 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         if self._parameterNode:
             self._parameterNode.disconnectGui(self._parameterNodeGuiTag)
             self._parameterNodeGuiTag = None
-            self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self._checkCanApply)
+            self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.onParameterNodeModified)
+            self._checkCanApplyTimer.stop()
 
 
     def onSceneStartClose(self, caller, event) -> None:
@@ -406,142 +452,156 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         # so that when the scene is saved and reloaded, these settings are restored.
         self.setParameterNode(self.logic.getParameterNode())
 
-        # Select default input nodes if nothing is selected yet to save a few clicks for the user
-        if not self._parameterNode.input4DVolume:
-            firstInputSequenceNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLSequenceNode")
-
-            if firstInputSequenceNode:
-                self._parameterNode.input4DVolume = firstInputSequenceNode
-
-        # # JU - for the SER threshold slider, set the maximum to the UPPER_THRESHOLD:
-        self.ui.signalEnhancementRatioThreshold.maximum = self.SER_UPPER_THRESHOLD / (1.0 + self.SER_DELTA_FACTOR)
+        # JU - Pause the repainting of the module panel while the nodes and widgets below are set up, so the panel is
+        # redrawn once at the end instead of after each change
+        wasUpdatesEnabled = self.parent.updatesEnabled
+        self.parent.setUpdatesEnabled(False)
+        try:
+            # Select default input nodes if nothing is selected yet to save a few clicks for the user
+            if not self._parameterNode.input4DVolume:
+                firstInputSequenceNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLSequenceNode")
 
-        # JU - Initialise SERsegmentsLabels for SER values. It has to happens after the _parameterNode is created
-        self.setSERColourMapDict(update=True)
+                if firstInputSequenceNode:
+                    self._parameterNode.input4DVolume = firstInputSequenceNode
 
-        # JU 12/06/2024 - The following should happen only if input4D volume exist
-        # Initialise the output sequence that'll store the output maps, but only if the input sequence has been defined:
+            # # JU - for the SER threshold slider, set the maximum to the UPPER_THRESHOLD:
+            self.ui.signalEnhancementRatioThreshold.maximum = self.SER_UPPER_THRESHOLD / (1.0 + self.SER_DELTA_FACTOR)
 
-        if self._parameterNode.input4DVolume:
-            self._parameterNode.indicesDCE.setDefault(self._parameterNode.input4DVolume.GetNumberOfDataNodes())
-            self.setupBoxROI()
+            # JU - Initialise SERsegmentsLabels for SER values. It has to happens after the _parameterNode is created
+            self.setSERColourMapDict(update=True)
 
-            if not self._parameterNode.outputSequenceMaps:
-                self._parameterNode.outputSequenceMaps = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSequenceNode", "OutputSequenceNode")
-                # Set the index to be maps names:
-                self._parameterNode.outputSequenceMaps.SetIndexName("Maps")
-                self._parameterNode.outputSequenceMaps.SetIndexType(1)  # 0: Numeric; 1: Text
-                self._parameterNode.outputSequenceMaps.SetIndexUnit("")
-                self.outputSeqBrowser = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSequenceBrowserNode", "OutputSequenceBrowserNode")
-                self.outputSeqBrowser.SetAndObserveMasterSequenceNodeID(self._parameterNode.outputSequenceMaps.GetID())
+            # JU 12/06/2024 - The following should happen only if input4D volume exist
+            # Initialise the output sequence that'll store the output maps, but only if the input sequence has been defined:
 
-            # # Select default input nodes if nothing is selected yet to save a few clicks for the user
-            if not self._parameterNode.inputMaskVolume:
-                firstVolumeNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLSegmentationNode")
+            if self._parameterNode.input4DVolume:
+                self._parameterNode.indicesDCE.setDefault(self._parameterNode.input4DVolume.GetNumberOfDataNodes())
+                self.setupBoxROI()
+
+                if not self._parameterNode.outputSequenceMaps:
+                    # (bind the new node to a local, every access to the parameter node property resolves the node reference again)
+                    outputSequenceMaps = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSequenceNode", "OutputSequenceNode")
+                    # Set the index to be maps names:
+                    outputSequenceMaps.SetIndexName("Maps")
+                    outputSequenceMaps.SetIndexType(1)  # 0: Numeric; 1: Text
+                    outputSequenceMaps.SetIndexUnit("")
+                    self._parameterNode.outputSequenceMaps = outputSequenceMaps
+                    self.outputSeqBrowser = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSequenceBrowserNode", "OutputSequenceBrowserNode")
+                    self.outputSeqBrowser.SetAndObserveMasterSequenceNodeID(outputSequenceMaps.GetID())
+
+                # # Select default input nodes if nothing is selected yet to save a few clicks for the user
+                if not self._parameterNode.inputMaskVolume:
+                    firstVolumeNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLSegmentationNode")
                 
-                if firstVolumeNode:
-                    self._parameterNode.inputMaskVolume = firstVolumeNode
-                elif self._parameterNode.input4DVolume:
-                    self._parameterNode.inputMaskVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSegmentationNode", "Segmentation Mask")
-
-            # Now that the segmentation mask has been created, add a default segmentation to initialise it:
-            if self._parameterNode.inputMaskVolume:
-                # Get the number of segmentations attached to the segmentation node:
-                segmentations = self._parameterNode.inputMaskVolume.GetSegmentation()
+                    if firstVolumeNode:
+                        self._parameterNode.inputMaskVolume = firstVolumeNode
+                    elif self._parameterNode.input4DVolume:
+                        self._parameterNode.inputMaskVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLSegmentationNode", "Segmentation Mask")
+
+                # Now that the segmentation mask has been created, add a default segmentation to initialise it:
+                if self._parameterNode.inputMaskVolume:
+                    # Get the number of segmentations attached to the segmentation node:
+                    segmentations = self._parameterNode.inputMaskVolume.GetSegmentation()
                 
-                if segmentations.GetNumberOfSegments() < 1:
-                    # Create a new segmentation and attach it to the inputMaskVolume node:
-                    segmentations.AddEmptySegment()
+                    if segmentations.GetNumberOfSegments() < 1:
+                        # Create a new segmentation and attach it to the inputMaskVolume node:
+                        segmentations.AddEmptySegment()
                     
-                self.ui.segmentEditorWidget.setSegmentationNode(self._parameterNode.inputMaskVolume)
-                self.ui.segmentEditorWidget.setSourceVolumeNode(self.currentVolume) # self.currentVolume)
+                    self.ui.segmentEditorWidget.setSegmentationNode(self._parameterNode.inputMaskVolume)
+                    self.ui.segmentEditorWidget.setSourceVolumeNode(self.currentVolume) # self.currentVolume)
                 
-                self.segmentID = self.ui.segmentSelectorWidget.currentSegmentID()
+                    self.segmentID = self.ui.segmentSelectorWidget.currentSegmentID()
 
-                # Open the segment editor
-                self.ui.segmentEditorCollapsibleButton.collapsed=False
+                    # Open the segment editor
+                    self.ui.segmentEditorCollapsibleButton.collapsed=False
                 
-            # # Define a default output Label Map:
-            if not self._parameterNode.outputLabelMap:
-                firstOutputLabelMap = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLLabelMapVolumeNode")
+                # # Define a default output Label Map:
+                if not self._parameterNode.outputLabelMap:
+                    firstOutputLabelMap = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLLabelMapVolumeNode")
                 
-                if firstOutputLabelMap:
-                    self._parameterNode.outputLabelMap = firstOutputLabelMap
+                    if firstOutputLabelMap:
+                        self._parameterNode.outputLabelMap = firstOutputLabelMap
+                    else:
+                        # There are no output label map available, so create one by default:
+                        self._parameterNode.outputLabelMap = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLLabelMapVolumeNode", "SER Label Map")
+
+                # Create a default display node, so I can associate the colour table:
+                outputLabelMap = self._parameterNode.outputLabelMap
+                outputLabelMap.CreateDefaultDisplayNodes()
+
+                if (self.colourTableNode is None):
+                    # colourTableNode does not exist, let see whether the SER_labels colour table already exist
+                    # (stop at the first match, only one table is needed)
+                    ser_labels_colour_table = slicer.mrmlScene.GetFirstNode("SER_labels", "vtkMRMLColorTableNode")
+                    if ser_labels_colour_table is not None:
+                        # Then assign the existing table:
+                        self.colourTableNode = ser_labels_colour_table
+                    else:
+                        self.colourTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLColorTableNode", "SER_labels")
+
+                self.colourTableNode.SetTypeToUser()
+
+                # make the color table selectable in the GUI outside Colors module
+                self.colourTableNode.HideFromEditorsOff()
+                self.setupColourTable()
+
+                # # Associate the colour table with the label map --> Pay attention to the use cases, because there is an error at some point (not yet clear when though)
+                outputLabelMap.GetDisplayNode().SetAndObserveColorNodeID(self.colourTableNode.GetID())
+
+                # Select default plot and tables nodes, to avoid creating new ones:
+                if not self.outputTableSelector.currentNode():
+                    self.TICTableNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLTableNode")
+                    self.SummaryTableNode = slicer.mrmlScene.GetNthNodeByClass(1, "vtkMRMLTableNode")
+                    self.SERDistributionTableNode = slicer.mrmlScene.GetNthNodeByClass(2, "vtkMRMLTableNode")
+
+                    if not self.TICTableNode:
+                        self.TICTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode", "TIC Table")
+
+                    # TODO: Check how to assign multiple tables to selector
+                    if not self.SummaryTableNode:
+                        self.SummaryTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode", "Summary Table")
+
+                    if not self.SERDistributionTableNode:
+                        self.SERDistributionTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode", "SER Table")
+
+                    # (nothing is connected to this selector, so no need to emit its signals here)
+                    wasBlocked = self.outputTableSelector.blockSignals(True)
+                    self.outputTableSelector.setCurrentNode(self.SERDistributionTableNode)
+                    self.outputTableSelector.blockSignals(wasBlocked)
+
+                numberOfPlotSeriesNode = slicer.mrmlScene.GetNumberOfNodesByClass("vtkMRMLPlotSeriesNode")
+
+                if numberOfPlotSeriesNode == 0:
+                    firstPlotSeriesNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLPlotSeriesNode", "TIC plot")
+                    secondPlotSeriesNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLPlotSeriesNode", "Linear Fit")
+                elif numberOfPlotSeriesNode == 1:
+                    firstPlotSeriesNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLPlotSeriesNode")
+                    secondPlotSeriesNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLPlotSeriesNode", "Linear Fit")
                 else:
-                    # There are no output label map available, so create one by default:
-                    self._parameterNode.outputLabelMap = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLLabelMapVolumeNode", "SER Label Map")
-
-            # Create a default display node, so I can associate the colour table:
-            self._parameterNode.outputLabelMap.CreateDefaultDisplayNodes()
-
-            ser_labels_colour_table = slicer.mrmlScene.GetNodesByName("SER_labels")
-            if (self.colourTableNode is None):
-                # colourTableNode does not exist, let see whether the SER_labels colour table already exist
-                if ser_labels_colour_table.GetNumberOfItems() > 0:
-                    # Then assign the existing table:
-                    self.colourTableNode = ser_labels_colour_table.GetItemAsObject(0)
-                else:
-                    self.colourTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLColorTableNode", "SER_labels")
-
-            self.colourTableNode.SetTypeToUser()
-
-            # make the color table selectable in the GUI outside Colors module
-            self.colourTableNode.HideFromEditorsOff()
-            self.setupColourTable()
-
-            # # Associate the colour table with the label map --> Pay attention to the use cases, because there is an error at some point (not yet clear when though)
-            self._parameterNode.outputLabelMap.GetDisplayNode().SetAndObserveColorNodeID(self.colourTableNode.GetID())
-
-            # Select default plot and tables nodes, to avoid creating new ones:
-            if not self.outputTableSelector.currentNode():
-                self.TICTableNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLTableNode")
-                self.SummaryTableNode = slicer.mrmlScene.GetNthNodeByClass(1, "vtkMRMLTableNode")
-                self.SERDistributionTableNode = slicer.mrmlScene.GetNthNodeByClass(2, "vtkMRMLTableNode")
-
-                if not self.TICTableNode:
-                    self.TICTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode", "TIC Table")
-
-                # TODO: Check how to assign multiple tables to selector
-                if not self.SummaryTableNode:
-                    self.SummaryTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode", "Summary Table")
+                    firstPlotSeriesNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLPlotSeriesNode")
+                    secondPlotSeriesNode = slicer.mrmlScene.GetNthNodeByClass(1, "vtkMRMLPlotSeriesNode")
+            
+                self.plotSeriesNode = firstPlotSeriesNode
+                self.plotCurveFitNode = secondPlotSeriesNode
+                self.plotSeriesNode.SetAndObserveTableNodeID(self.TICTableNode.GetID())
+                self.plotCurveFitNode.SetAndObserveTableNodeID(self.TICTableNode.GetID())
 
-                if not self.SERDistributionTableNode:
-                    self.SERDistributionTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode", "SER Table")
+                firstPlotChartNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLPlotChartNode")
 
-                self.outputTableSelector.setCurrentNode(self.SERDistributionTableNode)
+                if not firstPlotChartNode:
+                    firstPlotChartNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLPlotChartNode", "TIC chart")
 
-            numberOfPlotSeriesNode = slicer.mrmlScene.GetNodesByClass("vtkMRMLPlotSeriesNode").GetNumberOfItems()
+                self.plotChartNode = firstPlotChartNode
 
-            if numberOfPlotSeriesNode == 0:
-                firstPlotSeriesNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLPlotSeriesNode", "TIC plot")
-                secondPlotSeriesNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLPlotSeriesNode", "Linear Fit")
-            elif numberOfPlotSeriesNode == 1:
-                firstPlotSeriesNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLPlotSeriesNode")
-                secondPlotSeriesNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLPlotSeriesNode", "Linear Fit")
-            else:
-                firstPlotSeriesNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLPlotSeriesNode")
-                secondPlotSeriesNode = slicer.mrmlScene.GetNthNodeByClass(1, "vtkMRMLPlotSeriesNode")
+                # Ensure there is no previous charts in the node (to avoid multiple legends appearing when re-loading):
+                self.plotChartNode.RemoveAllPlotSeriesNodeIDs()
                 
-            self.plotSeriesNode = firstPlotSeriesNode
-            self.plotCurveFitNode = secondPlotSeriesNode
-            self.plotSeriesNode.SetAndObserveTableNodeID(self.TICTableNode.GetID())
-            self.plotCurveFitNode.SetAndObserveTableNodeID(self.TICTableNode.GetID())
-
-            firstPlotChartNode = slicer.mrmlScene.GetFirstNodeByClass("vtkMRMLPlotChartNode")
+                self.plotChartNode.AddAndObservePlotSeriesNodeID(self.plotSeriesNode.GetID())
+                self.plotChartNode.AddAndObservePlotSeriesNodeID(self.plotCurveFitNode.GetID())
 
-            if not firstPlotChartNode:
-                firstPlotChartNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLPlotChartNode", "TIC chart")
-
-            self.plotChartNode = firstPlotChartNode
-
-            # Ensure there is no previous charts in the node (to avoid multiple legends appearing when re-loading):
-            self.plotChartNode.RemoveAllPlotSeriesNodeIDs()
-                    
-            self.plotChartNode.AddAndObservePlotSeriesNodeID(self.plotSeriesNode.GetID())
-            self.plotChartNode.AddAndObservePlotSeriesNodeID(self.plotCurveFitNode.GetID())
-            
-            # Finally, (re-)configure the plot window
-            self.configurePlotSeriesNode()
+                # Finally, (re-)configure the plot window
+                self.configurePlotSeriesNode()
+        finally:
+            self.parent.setUpdatesEnabled(wasUpdatesEnabled)
      
      
     def setParameterNode(self, inputParameterNode: Optional[quantificationParameterNode]) -> None:
@@ -552,7 +612,7 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
 
         if self._parameterNode:
             self._parameterNode.disconnectGui(self._parameterNodeGuiTag)
-            self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self._checkCanApply)
+            self.removeObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.onParameterNodeModified)
 
         self._parameterNode = inputParameterNode
 
@@ -560,15 +620,23 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
             # Note: in the .ui file, a Qt dynamic property called "SlicerParameterName" is set on each
             # ui element that needs connection.
             self._parameterNodeGuiTag = self._parameterNode.connectGui(self.ui)
-            self.addObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self._checkCanApply)
+            self.addObserver(self._parameterNode, vtk.vtkCommand.ModifiedEvent, self.onParameterNodeModified)
             
             if self._parameterNode.input4DVolume:
-                # Setup default positions for the sliders: preContrast = 0; earlyPostContrast = 1; latePostContrast = N_Nodes
-                self.setMaxIndexSelector(self._parameterNode.input4DVolume.GetNumberOfDataNodes())
-                self.setCurrentVolumeFromIndex(indexAsDouble=self._parameterNode.indicesDCE.earlyPostContrast)                
+                # Display the early post-contrast volume by default. The sliders range and the viewer are refreshed
+                # by _checkCanApply, so there is no need to call setMaxIndexSelector/setCurrentVolumeFromIndex here as well
+                sequenceBrowserNode = self.logic.findBrowserForSequence(self._parameterNode.input4DVolume)
+                if sequenceBrowserNode:
+                    sequenceBrowserNode.SetSelectedItemNumber(int(self._parameterNode.indicesDCE.earlyPostContrast))
                 self._checkCanApply()
                 
 
+    def onParameterNodeModified(self, caller=None, event=None) -> None:
+
+        # (re)start the single-shot timer, so all the changes made before it times out trigger one _checkCanApply
+        self._checkCanApplyTimer.start()
+
+
     def _checkCanApply(self, caller=None, event=None) -> None:
 
         if self._parameterNode and self._parameterNode.input4DVolume:
@@ -653,34 +721,39 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
                 self.onResetSegmentList()
 
             # Compute output
-            self.logic.process(self._parameterNode.input4DVolume, 
-                               self._parameterNode.inputMaskVolume, 
-                               self._parameterNode.outputSequenceMaps, 
-                               self._parameterNode.outputLabelMap,
-                               self.roiNode,
-                               self.SERsegmentsLabels,
-                               self.omitRoiList,
-                               {'TICTable': [self.TICTableNode, self.TICTableRowNames],
-                                'SummaryTable': [self.SummaryTableNode, self.SummaryTableRowNames],
-                                'SERSummaryTable': [self.SERDistributionTableNode, self.SERTableRowNames]},
-                               int(self._parameterNode.indicesDCE.preContrast),
-                               int(self._parameterNode.indicesDCE.earlyPostContrast),
-                               int(self._parameterNode.indicesDCE.latePostContrast),
-                               self.timings,
-                               self._parameterNode.peakEnhancementThreshold,
-                               self._parameterNode.backgroundThreshold,
-                               self.segmentID,
-                               self.SER_UPPER_THRESHOLD)
+            # (the views are rendered once the maps and segments are all in place, not after each intermediate update)
+            slicer.app.pauseRender()
+            try:
+                self.logic.process(self._parameterNode.input4DVolume, 
+                                   self._parameterNode.inputMaskVolume, 
+                                   self._parameterNode.outputSequenceMaps, 
+                                   self._parameterNode.outputLabelMap,
+                                   self.roiNode,
+                                   self.SERsegmentsLabels,
+                                   self.omitRoiList,
+                                   {'TICTable': [self.TICTableNode, self.TICTableRowNames],
+                                    'SummaryTable': [self.SummaryTableNode, self.SummaryTableRowNames],
+                                    'SERSummaryTable': [self.SERDistributionTableNode, self.SERTableRowNames]},
+                                   int(self._parameterNode.indicesDCE.preContrast),
+                                   int(self._parameterNode.indicesDCE.earlyPostContrast),
+                                   int(self._parameterNode.indicesDCE.latePostContrast),
+                                   self.timings,
+                                   self._parameterNode.peakEnhancementThreshold,
+                                   self._parameterNode.backgroundThreshold,
+                                   self.segmentID,
+                                   self.SER_UPPER_THRESHOLD)
+            finally:
+                slicer.app.resumeRender()
             self.update_plot_window()
             
             try:
                 # Set the X-range of the graph to be the even number closest to 125% of the maximum
-                xRange = np.array(self.TICTableNode.GetTable().GetColumn(0).GetFiniteRange())
-                xMax = np.floor(xRange[1] * 1.25)
-                xLims = [xRange[0],  xMax + ( xMax % 2 )]
+                xMin, xMax = self.TICTableNode.GetTable().GetColumn(0).GetFiniteRange()
+                xMax = math.floor(xMax * 1.25)
+                xLims = [xMin,  xMax + ( xMax % 2 )]
                 self.plotChartNode.XAxisRangeAutoOff()
                 self.plotChartNode.SetXAxisRange(xLims)
-            except:
+            except (AttributeError, IndexError, ValueError, OverflowError, RuntimeError):
                 logging.error('Cannot set the limits in the X-axis')
 
 
@@ -779,15 +852,10 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         if len(tm)<6:
             return 0
 
-        try:
-            hhmmss = tm.split('.')[0]
-        except:
-            hhmmss = tm
-
-        try:
-            ssfrac = float('0.'+tm.split('.')[1])
-        except:
-            ssfrac = 0.
+        # Split once into HHMMSS and the (optional) fraction of second, whole-second times have no '.'
+        timeParts = tm.split('.', 1)
+        hhmmss = timeParts[0]
+        ssfrac = float('0.'+timeParts[1]) if len(timeParts) > 1 else 0.
 
         if len(hhmmss)==6: # HHMMSS
             sec = float(hhmmss[0:2])*60.*60.+float(hhmmss[2:4])*60.+float(hhmmss[4:6])
@@ -810,18 +878,27 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
             if self._parameterNode.input4DVolume.GetAttribute("MultiVolume.FrameLabels") is not None:
                 
                 # Get acquisition times from DICOM metadata (output in ms)
-                self.timeFrames = np.array(self._parameterNode.input4DVolume.GetAttribute("MultiVolume.FrameLabels").split(',')).astype(float)
+                # (converted in one go with the array dtype, so a malformed label raises rather than being skipped)
+                self.timeFrames = np.array(self._parameterNode.input4DVolume.GetAttribute("MultiVolume.FrameLabels").split(','), dtype=np.float64)
             else:
                 if ( (self.timeFrames is None) or (not self._parameterNode.propagateTiming) ):
                     
                     nt = self._parameterNode.input4DVolume.GetNumberOfDataNodes()
                 
                     # normalise the time axis to nt = 1min = 60x10e3 [ms] to be consistent with the calculations  
-                    self.timeFrames = np.linspace(0, nt*60.0*1.0e3, num=nt, endpoint=True)
+                    self.timeFrames = _defaultTimeAxis(nt)
 
             logging.debug(f'Timeframe Labels: {self.timeFrames} (ms)')
             
-            if getBolus:
+            # The bolus time is read from the files of the sequence, so it is kept until the sequence (or its files) change,
+            # rather than reading all the files again every time Apply is clicked
+            frameFileList = self._parameterNode.input4DVolume.GetAttribute("MultiVolume.FrameFileList")
+            bolusCacheKey = (self._parameterNode.input4DVolume.GetID(), frameFileList)
+
+            if getBolus and (self._bolusTimeCache is not None) and (self._bolusTimeCache[:2] == bolusCacheKey):
+                bolusInjTimeRelativeToStart = self._bolusTimeCache[2]
+
+            elif getBolus:
                 
                 # Identify Bolus injection time
                 # Get the bolus time relative to the start of the acquisition time
@@ -829,21 +906,18 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
                 fileList = []
                 acquisitionTimes = []
                 bolusInjTimes = []
-                
-                # Contrast Bolus Start Time is recorded in different Dicom attributes, 
-                # depending on the manufacturer and sequence, so far, the following are known:
-                # Philips - Dyn eThrive: (0018, 1042) ContrastBolusStartTime
-                contrastBolusAttribute = ['ContrastBolusStartTime']
 
-                if self._parameterNode.input4DVolume.GetAttribute("MultiVolume.FrameFileList") is not None:
-                    fileList = self._parameterNode.input4DVolume.GetAttribute("MultiVolume.FrameFileList").split(',')
+                if frameFileList is not None:
+                    fileList = frameFileList.split(',')
 
                 for ifile in fileList:
                     dcmMetaData = pydcm.dcmread(ifile, stop_before_pixels=True)
                     acquisitionTimes.append((dcmMetaData.AcquisitionTime))
-                    for cb_attr in contrastBolusAttribute:
-                        if cb_attr in dcmMetaData:
-                            bolusInjTimes.append((dcmMetaData.ContrastBolusStartTime))
+                    # Use the first known attribute holding the bolus start time (see CONTRAST_BOLUS_ATTRIBUTES)
+                    for cb_attr in CONTRAST_BOLUS_ATTRIBUTES:
+                        bolusStartTime = getattr(dcmMetaData, cb_attr, None)
+                        if bolusStartTime is not None:
+                            bolusInjTimes.append(bolusStartTime)
                             break
                         
                 if acquisitionTimes:
@@ -858,6 +932,7 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
                     bolusInjTimeList = '0'
                     bolusInjTimeRelativeToStart = 0.0
 
+                self._bolusTimeCache = (*bolusCacheKey, bolusInjTimeRelativeToStart)
 
             else:
                 bolusInjTimeRelativeToStart = 0.0
@@ -874,19 +949,26 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
     def setTimeValueOnSlider(self) -> None:
         
         if self.timeFrames is not None:
-            self.ui.labelTimePreContrast.text = f'{self.timeFrames[int(self._parameterNode.indicesDCE.preContrast)]/(1000*60):.1f}[min]'
-            self.ui.labelTimeEarlyPostContrast.text = f'{self.timeFrames[int(self._parameterNode.indicesDCE.earlyPostContrast)]/(1000*60):.1f}[min]'
-            self.ui.labelTimeLatePostContrast.text = f'{self.timeFrames[int(self._parameterNode.indicesDCE.latePostContrast)]/(1000*60):.1f}[min]'
+            # Gather the three relevant time points at once (from ms to min)
+            indicesDCE = self._parameterNode.indicesDCE
+            timesInMinutes = self.timeFrames[np.array([indicesDCE.preContrast,
+                                                       indicesDCE.earlyPostContrast,
+                                                       indicesDCE.latePostContrast], dtype=int)] / (1000*60)
+            self.ui.labelTimePreContrast.text = f'{timesInMinutes[0]:.1f}[min]'
+            self.ui.labelTimeEarlyPostContrast.text = f'{timesInMinutes[1]:.1f}[min]'
+            self.ui.labelTimeLatePostContrast.text = f'{timesInMinutes[2]:.1f}[min]'
 
         
     def setupBoxROI(self, name="RefBox", omitBox=False) -> None:
         
-        roiNodes = slicer.mrmlScene.GetNodesByClassByName("vtkMRMLMarkupsROINode","RefBox")
-        if roiNodes.GetNumberOfItems() < 1:
-            self.roiNode = None
-        else:
-            # Just to keep it simple, the first RefBox is the main one:
-            self.roiNode = roiNodes.GetItemAsObject(0)
+        # Only look for the RefBox in the scene if the one found (or created) before is no longer there
+        if (self.roiNode is None) or (not slicer.mrmlScene.IsNodePresent(self.roiNode)):
+            roiNodes = slicer.mrmlScene.GetNodesByClassByName("vtkMRMLMarkupsROINode","RefBox")
+            if roiNodes.GetNumberOfItems() < 1:
+                self.roiNode = None
+            else:
+                # Just to keep it simple, the first RefBox is the main one:
+                self.roiNode = roiNodes.GetItemAsObject(0)
         
         if self._parameterNode is not None:
             # Added support to add additional boxes as OMIT regions
@@ -942,8 +1024,8 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
         resetSegmentList = False
         for omitRegion in self.omitRoiList:
             logging.debug(f'Region Name: {omitRegion.GetName()}')
-            getOmitRegionByName = slicer.mrmlScene.GetNodesByName(omitRegion.GetName())
-            if getOmitRegionByName.GetNumberOfItems() < 1:
+            # Only the existence of the node matters, so stop at the first match rather than collecting all of them:
+            if slicer.mrmlScene.GetFirstNodeByName(omitRegion.GetName()) is None:
                 logging.debug(f'Omit Region "{omitRegion.GetName()}" does not exist anymore')
                 self.omitRoiList.remove(omitRegion)
                 # After the loop, will need to reset the segment mask
@@ -975,17 +1057,34 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
     
     # JU - separate to refresh the index selctors everytime the module is loaded (not only when the input selector changes)
     def setMaxIndexSelector(self, maxIndex) -> None:
-                
-        for sequenceItemSelectorWidget in [self.ui.indexSliderPreContrast, self.ui.indexSliderEarlyPostContrast, self.ui.indexSliderLatePostContrast, self.ui.minuendIndexSelector, self.ui.subtrahendIndexSelector]:
 
-            if maxIndex < 1:
-                sequenceItemSelectorWidget.maximum = 0
-                sequenceItemSelectorWidget.enabled = False
-            else:
-                sequenceItemSelectorWidget.maximum = maxIndex-1
-                sequenceItemSelectorWidget.enabled = True
-                    
-        
+        # Block the widgets signals while updating their range, so the valueChanged/rangeChanged
+        # signals don't re-trigger the callbacks (and _checkCanApply) once per widget
+        wasBlocked = [sequenceItemSelectorWidget.blockSignals(True) for sequenceItemSelectorWidget in self._indexSliderWidgets]
+
+        try:
+            for sequenceItemSelectorWidget in self._indexSliderWidgets:
+
+                if maxIndex < 1:
+                    sequenceItemSelectorWidget.maximum = 0
+                    sequenceItemSelectorWidget.enabled = False
+                else:
+                    sequenceItemSelectorWidget.maximum = maxIndex-1
+                    sequenceItemSelectorWidget.enabled = True
+        finally:
+            for sequenceItemSelectorWidget, blocked in zip(self._indexSliderWidgets, wasBlocked):
+                sequenceItemSelectorWidget.blockSignals(blocked)
+
+        # With the signals blocked, the values Qt clamped to the new range don't reach the parameter node, so clamp the
+        # indices stored there as well (only those out of range, so the parameter node isn't modified needlessly)
+        if self._parameterNode is not None:
+            maxValidIndex = max(maxIndex-1, 0)
+            for indicesPack, indexNames in ((self._parameterNode.indicesDCE, ('preContrast', 'earlyPostContrast', 'latePostContrast')),
+                                            (self._parameterNode.subtractIndices, ('minuend', 'subtrahend'))):
+                for indexName in indexNames:
+                    if getattr(indicesPack, indexName) > maxValidIndex:
+                        setattr(indicesPack, indexName, maxValidIndex)
+
         
     def setCurrentVolumeFromIndex(self, indexAsDouble=None) -> None:
 
@@ -1083,14 +1182,16 @@ class quantificationWidget(ScriptedLoadableModuleWidget, VTKObservationMixin):
     def setupColourTable(self) -> None:
 
         nLabels = len(self.SERsegmentsLabels['colourMap'])
-        self.colourTableNode.SetNumberOfColors(nLabels)
-        self.colourTableNode.SetNamesInitialised(True) # prevent automatic color name generation
+        # Fill the whole table before reporting it as modified, so the observers (e.g. the label map display) update once
+        with slicer.util.NodeModify(self.colourTableNode):
+            self.colourTableNode.SetNumberOfColors(nLabels)
+            self.colourTableNode.SetNamesInitialised(True) # prevent automatic color name generation
 
-        for idx, (legend, [r,g,b,a]) in enumerate(self.SERsegmentsLabels['colourMap'].items()):
-            success = self.colourTableNode.SetColor(idx, legend, r, g, b, a)
+            for idx, (legend, [r,g,b,a]) in enumerate(self.SERsegmentsLabels['colourMap'].items()):
+                success = self.colourTableNode.SetColor(idx, legend, r, g, b, a)
 
-            if success:
-                logging.debug(f'(setupColourTable) {idx}) Legend: {legend} - (success: {success})')
+                if success:
+                    logging.debug(f'(setupColourTable) {idx}) Legend: {legend} - (success: {success})')
             
         
     def setSERColourMapDict(self, update=False, serUpperThreshold=None):
@@ -1183,6 +1284,13 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         self.PIXEL_CONNECTIVITY = 4
         self.FG_OPACITY = 0.5
         self.LB_OPACITY = 0.0
+
+        # Cache of sequence node ID -> sequence browser node, used by findBrowserForSequence.
+        # Each cached browser is re-validated when it is looked up, so the cache doesn't need to observe the scene
+        self._browserForSequenceCache = {}
+
+        # SegmentStatistics logic used by getStatsFromAllSegments, created (and configured) on first use
+        self._segStatLogic = None
         
         
     def getParameterNode(self):
@@ -1196,27 +1304,49 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         # TODO: Check error when loading data before invoking the module for the first time:
         # [VTK] vtkMRMLSequenceBrowserNode::IsSynchronizedSequenceNode failed: sequenceNode is invalid
         # [Qt] void qMRMLSegmentEditorWidget::setSourceVolumeNode(vtkMRMLNode *)  failed: need to set segment editor and segmentation nodes first
+        if sequenceNode is None:
+            return None
+
+        sequenceNodeID = sequenceNode.GetID()
+        browserNode = self._browserForSequenceCache.get(sequenceNodeID)
+
+        # The cached browser may have been removed from the scene, or its synchronized sequences changed, so check it is still valid:
+        if (browserNode is not None and slicer.mrmlScene.IsNodePresent(browserNode) 
+            and browserNode.IsSynchronizedSequenceNode(sequenceNode, True)):
+            return browserNode
+
         browserNodes = slicer.util.getNodesByClass("vtkMRMLSequenceBrowserNode")
 
         for browserNode in browserNodes:
             if browserNode.IsSynchronizedSequenceNode(sequenceNode, True):
+                self._browserForSequenceCache[sequenceNodeID] = browserNode
                 return browserNode
 
         return None
-    
+
+
            
+    def iterSegments(self, maskVolumeNode):
+
+        # Generator over the segments, for callers that only need to walk through them once
+        segmentation = maskVolumeNode.GetSegmentation()
+
+        for idx in range(segmentation.GetNumberOfSegments()):
+            yield segmentation.GetNthSegment(idx)
+
+
     def getSegmentList(self, maskVolumeNode):
 
-        nsegments = maskVolumeNode.GetSegmentation().GetNumberOfSegments()
-        segmentList = [maskVolumeNode.GetSegmentation().GetNthSegment(idx) for idx in range(nsegments)]
+        segmentList = list(self.iterSegments(maskVolumeNode))
 
         return segmentList
 
 
     def displayTable(self, currentTable):
-        slicer.app.applicationLogic().GetSelectionNode().SetActiveTableID(currentTable.GetID())
+        appLogic = slicer.app.applicationLogic()
+        appLogic.GetSelectionNode().SetActiveTableID(currentTable.GetID())
         currentTable.SetUseColumnTitleAsColumnHeader(True)  # Make column titles visible (instead of column names)
-        slicer.app.applicationLogic().PropagateTableSelection()
+        appLogic.PropagateTableSelection()
     
             
     def updateViewer(self, backgroundVolume, foregroundVolume=None, labelVolume=None, labelOpacity=None):
@@ -1234,8 +1364,9 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
             colorLegendDisplayNode.SetVisibility(True)
             colorLegendDisplayNode.GetLabelTextProperty().SetFontFamilyToArial()
         
+        layoutManager = slicer.app.layoutManager()
         for channels in ["Red", "Yellow"]:
-            view = slicer.app.layoutManager().sliceWidget(channels).sliceView()
+            view = layoutManager.sliceWidget(channels).sliceView()
             view.cornerAnnotation().SetText(vtk.vtkCornerAnnotation.UpperLeft, cornerLabel)
                     
         slicer.util.setSliceViewerLayers(background=backgroundVolume, 
@@ -1278,8 +1409,11 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
                 displayNode.GetVolumePropertyNode().Copy(volRenLogic.GetPresetByName("CT-MIP"))
 
         # Switch views to MIP mode
-        for viewNode in slicer.util.getNodesByClass("vtkMRMLViewNode"):
-            viewNode.SetRaycastTechnique(slicer.vtkMRMLViewNode.MaximumIntensityProjection)
+        # (iterate over the scene collection directly, there is no need to copy it into a list first)
+        viewNodes = slicer.mrmlScene.GetNodesByClass("vtkMRMLViewNode")
+
+        for idx in range(viewNodes.GetNumberOfItems()):
+            viewNodes.GetItemAsObject(idx).SetRaycastTechnique(slicer.vtkMRMLViewNode.MaximumIntensityProjection)
 
         # Show volume rendering
         displayNode.SetVisibility(True)
@@ -1291,54 +1425,134 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         
         maskSegmentations = segmentationVolumeNode.GetSegmentation()
 
-        if items_to_remove is not None:
+        # Group the removals, so the segmentation node is reported as modified once rather than once per segment
+        # The segments are removed by ID, which avoids looking each segment up again from its object
+        with slicer.util.NodeModify(segmentationVolumeNode):
+            if items_to_remove is not None:
+                segmentIDsToRemove = [segment_iID for segment_iID in maskSegmentations.GetSegmentIDs() 
+                                      if maskSegmentations.GetSegment(segment_iID).GetName() in items_to_remove]
 
-            for segment_iID in maskSegmentations.GetSegmentIDs():
-                segment_i = maskSegmentations.GetSegment(segment_iID)
+                for segment_iID in segmentIDsToRemove:
+                    maskSegmentations.RemoveSegment(segment_iID)
+            else:
+                # Remove all segments and create a new one empty
+                maskSegmentations.RemoveAllSegments()
+                maskSegmentations.AddEmptySegment()
 
-                if segment_i.GetName() in items_to_remove:
-                    maskSegmentations.RemoveSegment(segment_i)
-        else:
-            # Remove all segments and create a new one empty
-            for segment_iID in maskSegmentations.GetSegmentIDs():
-                segment_i = maskSegmentations.GetSegment(segment_iID)
-                maskSegmentations.RemoveSegment(segment_i)
 
-            maskSegmentations.AddEmptySegment()
+    def getZeroedArrayFromVolume(self, volumeNode, dtype):
+
+        # Re-allocate the voxels of the volume with the given data type (same dimensions) and return them as a zero-filled,
+        # writable view. Call slicer.util.arrayFromVolumeModified once the array has been written
+        volumeNode.GetImageData().AllocateScalars(get_vtk_array_type(np.dtype(dtype)), 1)
+        volumeArray = slicer.util.arrayFromVolume(volumeNode)
+        volumeArray.fill(0)
+
+        return volumeArray
 
 
     # JU - Crop Volume from ROI Box:
-    def cropVolumeFromROI(self, inputVolumeArray, referenceBoxROINode, referenceScalarVolumeNode):
-        
-        slicer.util.updateVolumeFromArray(referenceScalarVolumeNode, inputVolumeArray)
+    def getSlicesFromIJKCoordinates(self, IJKcoordinatesDict):
+
+        # numpy arrays from volumes are ordered as [k, j, i], so reverse the IJK bounds to get the slices along each axis
+        return tuple(slice(IJKcoordinatesDict['IJKmin'][axis], IJKcoordinatesDict['IJKmax'][axis]) for axis in (2, 1, 0))
+
+
+    def cropVolumeFromROI(self, inputVolumeArray, referenceBoxROINode, referenceScalarVolumeNode, roiIJK=None):
+
+        # The ROI box is snapped to the voxel grid of the reference volume (see getBoxROIIJKCoordinates), so the cropped
+        # volume is simply a slice of the input array. It works for 3D and 4D ([nt, nz, ny, nx]) arrays and returns a view,
+        # so make a copy if the output is going to be modified.
+        if roiIJK is None:
+            roiIJK = self.getBoxROIIJKCoordinates(referenceBoxROINode, referenceScalarVolumeNode)
+
+        croppedVolume = inputVolumeArray[(Ellipsis, *self.getSlicesFromIJKCoordinates(roiIJK))]
 
-        cropVolumeLogic = slicer.modules.cropvolume.logic()
-        cropVolumeParameterNode = slicer.vtkMRMLCropVolumeParametersNode()
-        cropVolumeParameterNode.SetROINodeID(referenceBoxROINode.GetID())
-        cropVolumeParameterNode.SetInputVolumeNodeID(referenceScalarVolumeNode.GetID())
-        cropVolumeParameterNode.SetVoxelBased(True)
-        cropVolumeLogic.SnapROIToVoxelGrid(cropVolumeParameterNode)  # rotates the ROI to match the volume axis directions
-        cropVolumeLogic.Apply(cropVolumeParameterNode)
-        croppedVolumeNode = slicer.mrmlScene.GetNodeByID(cropVolumeParameterNode.GetOutputVolumeNodeID())
-        croppedVolume = slicer.util.arrayFromVolume(croppedVolumeNode)
-        
-        slicer.mrmlScene.RemoveNode(croppedVolumeNode)
-        
         return croppedVolume
-    
-    def cropSequenceVolumeFromROI(self, inputSequenceArray, referenceBoxROINode, referenceScalarVolumeNode):
-            
-        nt = inputSequenceArray.shape[0]
-        croppedSequenceVolume = []
 
-        for idt in range(nt):
-            croppedSequenceVolume.append(self.cropVolumeFromROI(inputSequenceArray[idt,:,:,:],referenceBoxROINode,referenceScalarVolumeNode))
+    def cropSequenceVolumeFromROI(self, inputSequenceArray, referenceBoxROINode, referenceScalarVolumeNode, roiIJK=None):
+
+        # All the volumes share the same geometry, so the whole sequence is cropped with a single slice:
+        outputVolumeArray = self.cropVolumeFromROI(inputSequenceArray, referenceBoxROINode, referenceScalarVolumeNode, roiIJK)
 
-        outputVolumeArray = np.stack(croppedSequenceVolume, axis=0)
-        
         return outputVolumeArray
 
         
+    def computePESERMaps(self, St0, St1, Stn, labelMask, bckgrndThreshold, PEthreshold, serUpperThreshold):
+        """
+        Compute the Percentage of Enhancement (PE) and Signal Enhancement Ratio (SER) maps, and the mask of voxels
+        that pass the background and PE thresholds. Only the voxels within the label mask and above the background
+        threshold are used in the calculations, the results are then scattered back into zero-filled maps.
+        :param St0: pre-contrast volume
+        :param St1: early post-contrast volume
+        :param Stn: late post-contrast volume
+        :param labelMask: binary mask of the region of interest
+        :return: PE map, SER map (both zeroed outside the mask) and the mask
+        """
+
+        base_mask = np.greater_equal(St0, bckgrndThreshold)
+        np.logical_and(base_mask, labelMask, out=base_mask)
+        # JU - A small tumour within a large ROI box leaves most of the voxels out of the mask, so gather the active
+        # voxels first rather than working over the whole box
+        activeIndex = np.flatnonzero(base_mask)
+        s0 = St0.ravel()[activeIndex]
+        s1_minus_s0 = St1.ravel()[activeIndex] - s0
+        sn_minus_s0 = Stn.ravel()[activeIndex] - s0
+
+        # PE = 100 * (S1 - S0) / (S0 + EPSILON)
+        # (the gathered arrays are not needed afterwards, so the denominators are computed in place)
+        pe = np.multiply(s1_minus_s0, 100.0)
+        s0 += self.EPSILON
+        pe /= s0
+
+        # SER = (S1 - S0) / (Sn - S0 + EPSILON), where any value outside [0, serUpperThreshold] is non-SER (i.e. 0):
+        sn_minus_s0 += self.EPSILON
+        ser = np.divide(s1_minus_s0, sn_minus_s0, out=sn_minus_s0)
+        # Voxels below the PE threshold or with undefined SER values (i.e. NaN) are excluded from the mask
+        valid = (pe >= PEthreshold) & ~np.isnan(ser)
+        ser[(ser < 0.0) | (ser > serUpperThreshold)] = 0.0
+        activeIndex = activeIndex[valid]
+
+        # Reuse the mask buffer for the final mask (i.e. background, label and PE thresholds, and defined SER)
+        base_mask.fill(False)
+        PE = np.zeros(St0.shape, dtype=pe.dtype)
+        SER = np.zeros(St0.shape, dtype=ser.dtype)
+        np.put(base_mask, activeIndex, True)
+        np.put(PE, activeIndex, pe[valid])
+        np.put(SER, activeIndex, ser[valid])
+
+        return PE, SER, base_mask
+
+
+    def getPeakBlockMean(self, volumeArray, blockSize=3):
+
+        # Maximum of the means over the non-overlapping blockSize^3 sub-matrices of the volume. The volume is reshaped so
+        # each block has its own axes, which avoids convolving the whole volume just to sample the block centres
+        nBlocks = [dim // blockSize for dim in volumeArray.shape]
+        blocks = volumeArray[:nBlocks[0]*blockSize, :nBlocks[1]*blockSize, :nBlocks[2]*blockSize]
+        blocks = blocks.reshape(nBlocks[0], blockSize, nBlocks[1], blockSize, nBlocks[2], blockSize)
+
+        return blocks.mean(axis=(1, 3, 5)).max()
+
+
+    def getSERLevelsLabelMap(self, SER, levelThresholdDict):
+
+        # Label each voxel with the SER interval it falls in: LB[idx] < SER ≤ UB[idx] ==> idx + 1, and 0 (non SER) otherwise.
+        # The intervals are contiguous (UB[idx] == LB[idx+1]), so a single sorted search over the edges labels all the voxels at once
+        nLevels = len(levelThresholdDict['UB'])
+
+        if nLevels == 0:
+            # JU 30/07/2024: How to deal with this if is NON-SER??
+            return (SER > 0.0).view(np.uint8) # bool -> uint8 is the same memory, no need for a copy
+
+        SERedges = np.asarray([levelThresholdDict['LB'][0], *levelThresholdDict['UB']], dtype=SER.dtype)
+        SERmap = np.searchsorted(SERedges, SER, side='left').astype(np.uint8)
+        # Anything above the last upper bound is non SER:
+        SERmap[SERmap > nLevels] = 0
+
+        return SERmap
+
+
     # JU - Fitting functions
     def simple_linear_fit(self, time_axis, sample_points, norder = 1):
 
@@ -1356,16 +1570,25 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         nt = sequenceNode.GetNumberOfDataNodes()
 
         # Size of the numpy array is ordered as [nz, ny(row), nx(col)] TODO: verify row and col are correctly assigned!!
-        volume0 = slicer.util.arrayFromVolume(sequenceNode.GetNthDataNode(0))
-        [nz, ny, nx] = volume0.shape
-        inputVolumeArray = np.zeros([nt, nz, ny, nx]) # JU to follow ITK convention for 4D volumes
+        # arrayFromVolume returns views of the volumes' voxels, so collecting them first doesn't copy any data
+        volumeArrays = [slicer.util.arrayFromVolume(sequenceNode.GetNthDataNode(volumeIndex)) for volumeIndex in range(nt)]
+        [nz, ny, nx] = volumeArrays[0].shape
+        # Keep the native data type of the volumes (e.g. int16 for most DICOM data) and skip the zero-initialisation,
+        # as every time point is copied in below. Any float conversion is done later, on the cropped volumes only.
+        # The frames may not all share the same type (e.g. after registration), so promote to a type that holds all of them
+        # (pairwise, np.result_type takes a limited number of arguments), and copy them without any unsafe cast (a frame that can't be represented raises rather than being truncated)
+        inputVolumeArray = np.empty((nt, nz, ny, nx), dtype=functools.reduce(np.promote_types, (volumeArray.dtype for volumeArray in volumeArrays))) # JU to follow ITK convention for 4D volumes
+
+        np.copyto(inputVolumeArray[0], volumeArrays[0], casting='safe')
 
-        inputVolumeArray[0,:,:,:] = volume0
+        # The Maximum Intensity Projection (MIP) over time is accumulated while loading, so the 4D array doesn't need to be read again
+        mipVolumeArray = np.array(inputVolumeArray[0], copy=True)
 
         for volumeIndex in range(1, nt):
-            inputVolumeArray[volumeIndex, :, :, :] = slicer.util.arrayFromVolume(sequenceNode.GetNthDataNode(volumeIndex))
+            np.copyto(inputVolumeArray[volumeIndex], volumeArrays[volumeIndex], casting='safe')
+            np.maximum(mipVolumeArray, inputVolumeArray[volumeIndex], out=mipVolumeArray)
         
-        return inputVolumeArray
+        return inputVolumeArray, mipVolumeArray
 
         
     def subtractVolumes(self, inputSequenceNode, minuendIndex, subtrahendIndex, outputVolumeNode=None):
@@ -1389,32 +1612,55 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         
         # To get Summary statistics use the SegmentStatistics module
         # It returns a dictionary with the statistics corresponding to the segmentID provided
+        # (when the statistics of several segments are needed, use getStatsFromAllSegments instead)
+        return self.getStatsFromAllSegments(volumeMaskNode)[segmentID]
+
+
+    def getStatsFromAllSegments(self, volumeMaskNode):
+
+        # SegmentStatistics computes every segment of the segmentation in one go, so return them all.
+        # It returns a dictionary of statistics dictionaries (as in getStatsFromMask), keyed by segment ID
         # To get the complete list of statistics use:
         # import SegmentStatistics
         # SegmentStatistics.SegmentStatisticsLogic().getParameterNode().GetParameterNames()
 
-        import SegmentStatistics
-        segStatLogic = SegmentStatistics.SegmentStatisticsLogic()
+        if self._segStatLogic is None:
+            # The plugins only need to be set up once, then just the segmentation changes between calls
+            import SegmentStatistics
+            self._segStatLogic = SegmentStatistics.SegmentStatisticsLogic()
+            self._segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_origin_ras.enabled",str(True))
+            self._segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_diameter_mm.enabled",str(True))
+            self._segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_direction_ras_x.enabled",str(True))
+            self._segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_direction_ras_y.enabled",str(True))
+            self._segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_direction_ras_z.enabled",str(True))
+            # Only the labelmap measurements are reported (volume, voxel count and OBB diameter), so skip the plugins that need a 
+            # closed surface representation or a scalar volume, and the surface area (which extracts a surface from the labelmap)
+            self._segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.surface_area_mm2.enabled",str(False))
+            self._segStatLogic.getParameterNode().SetParameter("ClosedSurfaceSegmentStatisticsPlugin.enabled",str(False))
+            self._segStatLogic.getParameterNode().SetParameter("ScalarVolumeSegmentStatisticsPlugin.enabled",str(False))
+        segStatLogic = self._segStatLogic
         segStatLogic.getParameterNode().SetParameter("Segmentation", volumeMaskNode.GetID())
-        segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_origin_ras.enabled",str(True))
-        segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_diameter_mm.enabled",str(True))
-        segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_direction_ras_x.enabled",str(True))
-        segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_direction_ras_y.enabled",str(True))
-        segStatLogic.getParameterNode().SetParameter("LabelmapSegmentStatisticsPlugin.obb_direction_ras_z.enabled",str(True))
         segStatLogic.computeStatistics()
         stats = segStatLogic.getStatistics()
         outputStats = {}
 
-        for statPlugInName, measurementDetails in stats['MeasurementInfo'].items():
-            outputStats[statPlugInName.replace('LabelmapSegmentStatisticsPlugin.','')] = measurementDetails
-            outputStats[statPlugInName.replace('LabelmapSegmentStatisticsPlugin.','')]['value'] = stats[segmentID, statPlugInName]
+        for segmentID in stats['SegmentIDs']:
+            outputStats[segmentID] = {}
+            for statPlugInName, measurementDetails in stats['MeasurementInfo'].items():
+                # A measurement may be missing for a segment (e.g. an empty segment). Report it explicitly as NaN, so it 
+                # propagates as "no value" through the summary tables rather than as None
+                statKey = (segmentID, statPlugInName)
+                statValue = stats[statKey] if statKey in stats else np.nan
+                # Copy the measurement details, as they are shared by all the segments:
+                outputStats[segmentID][statPlugInName.replace('LabelmapSegmentStatisticsPlugin.','')] = {**measurementDetails, 
+                                                                                                       'value': statValue}
 
         return outputStats
 
 
     # Get ROI coordinates:
     def getBoxROIIJKCoordinates(self, markupROINode, referenceVolumeNode, transformedVolume=False):
-        
+
         markupROI_RAS = self.getRASmarkupROICoordinates(markupROINode)
 
         # If volume node is transformed, apply that transform to get volume's RAS coordinates
@@ -1445,14 +1691,15 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
     def convertRAStoIJKVolumeNodeCoordinates(self, RAScoordinatesDict, referenceVolumeNode):
         
         volumeSize = referenceVolumeNode.GetImageData().GetDimensions() # IJK
-        bbox_ijk = np.ones((2,4))
-        referenceDimensions = np.full_like(bbox_ijk, np.append(volumeSize,2), dtype=int) - 1
+        referenceDimensions = np.full((2,4), np.append(volumeSize,2), dtype=int) - 1
         
         volumeRasToIjk = vtk.vtkMatrix4x4()
         referenceVolumeNode.GetRASToIJKMatrix(volumeRasToIjk)
-        volumeRasToIjk.MultiplyPoint(np.append(RAScoordinatesDict['RASmin'], 1.0), bbox_ijk[0,:])
-
-        volumeRasToIjk.MultiplyPoint(np.append(RAScoordinatesDict['RASmax'], 1.0), bbox_ijk[1,:])
+        # Transform both corners at once, with the matrix copied into numpy, rather than one MultiplyPoint call per corner:
+        bboxRAS = np.ones((2,4))
+        bboxRAS[0,:3] = RAScoordinatesDict['RASmin']
+        bboxRAS[1,:3] = RAScoordinatesDict['RASmax']
+        bbox_ijk = bboxRAS @ slicer.util.arrayFromVTKMatrix(volumeRasToIjk).T
         
         # Round the elements and convert them to integer:
         bbox_ijk = bbox_ijk.round().astype(int)
@@ -1492,8 +1739,9 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         cropVolumeParameters = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLCropVolumeParametersNode")
         cropVolumeParameters.SetInputVolumeNodeID(referenceVolumeNode.GetID())
         cropVolumeParameters.SetROINodeID(markupROINode.GetID())
-        slicer.modules.cropvolume.logic().SnapROIToVoxelGrid(cropVolumeParameters)  # optional (rotates the ROI to match the volume axis directions)
-        slicer.modules.cropvolume.logic().FitROIToInputVolume(cropVolumeParameters)
+        cropVolumeLogic = slicer.modules.cropvolume.logic()
+        cropVolumeLogic.SnapROIToVoxelGrid(cropVolumeParameters)  # optional (rotates the ROI to match the volume axis directions)
+        cropVolumeLogic.FitROIToInputVolume(cropVolumeParameters)
         slicer.mrmlScene.RemoveNode(cropVolumeParameters)        
         
     # JU - End of user-defined section
@@ -1540,30 +1788,30 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
                 return
                     
         # Get input volume dimensions
-        inputVolume4Darray = self.getVolumeDataFromSequence(inputVolumeSequenceNode)
+        inputVolume4Darray, mip_volume = self.getVolumeDataFromSequence(inputVolumeSequenceNode)
         [nt, nz, nx, ny] = inputVolume4Darray.shape
 
         # Allocate space in TICtable for the intensity values from the DCE array
-        time_intensity_curve = np.full((nt, len(tableNodeDict['TICTable'][1])), np.nan)
-        time_intensity_curve[:,0] = np.linspace(0, nt, nt, endpoint=False) 
+        time_intensity_curve = np.empty((nt, len(tableNodeDict['TICTable'][1])))
+        time_intensity_curve[:, 1:] = np.nan
         if timings is not None:
             time_intensity_curve[:, 0] = timings['timepoints'] / (1000 * 60) # From ms to min
+        else:
+            time_intensity_curve[:, 0] = np.arange(nt)
         
-        # JU - Create temporary volumes to work with inside this function:
-        # Pre-populate it with the info from the first input volume in the input sequence, so we get the same image orientation,dimensions, etc.:
-        tempReferenceVolumeNode = slicer.modules.volumes.logic().CloneVolume(inputVolumeSequenceNode.GetNthDataNode(0), "temporary")        
-        tempSERVolumeNode = slicer.modules.volumes.logic().CloneVolume(inputVolumeSequenceNode.GetNthDataNode(0), "serMap")        
-        tempPEVolumeNode  = slicer.modules.volumes.logic().CloneVolume(inputVolumeSequenceNode.GetNthDataNode(0), "peMap")        
-        
-        roiIJK = self.getBoxROIIJKCoordinates(referenceBoxROINode, tempReferenceVolumeNode)
+        # JU - Create a temporary volume to work with inside this function:
+        # Pre-populate it with the info from the first input volume in the input sequence, so we get the same image orientation,dimensions, etc.
+        # The same node is reused for the MIP, PE and SER maps (SetDataNodeAtValue copies its content into the sequence).
+        # Its voxels are overwritten by the MIP straight away, so only the geometry is cloned (not the image data):
+        tempReferenceVolumeNode = slicer.modules.volumes.logic().CloneVolumeGeneric(slicer.mrmlScene, inputVolumeSequenceNode.GetNthDataNode(0), 
+                                                                                    "temporary", False)
 
         # MIP to be used as the backgdround image for the maps and set up a global threshold from the pre-contrast image
-        mip_volume = np.max(inputVolume4Darray, axis=0)
         slicer.util.updateVolumeFromArray(tempReferenceVolumeNode, mip_volume)
         outputMapsSequenceNode.SetDataNodeAtValue(tempReferenceVolumeNode, "MIP")
-        
-        SERmapTemplate = np.zeros((nz,ny,nx))
-        PEmapTemplate  = np.zeros((nz,ny,nx))
+
+        # (the ROI coordinates need the image dimensions, so they are computed once the MIP is in place)
+        roiIJK = self.getBoxROIIJKCoordinates(referenceBoxROINode, tempReferenceVolumeNode)
         
         # Get the segment selected by the list "Segment Label Mask":
         maskSegmentation = maskVolumeSegmentationNode.GetSegmentation()
@@ -1580,13 +1828,14 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         if not label.any():
             # the selected mask is empty --> use the ROI markup box only
             # Get ROI box as nd binary array:
-            voi_mask = np.zeros((nz, ny, nx))
-            voi_mask[roiIJK['IJKmin'][2]:roiIJK['IJKmax'][2], roiIJK['IJKmin'][1]:roiIJK['IJKmax'][1], roiIJK['IJKmin'][0]:roiIJK['IJKmax'][0]] = 1
+            # (the binary labelmap is imported as uint8, so there is no need for a float mask)
+            voi_mask = np.zeros((nz, ny, nx), dtype=np.uint8)
+            voi_mask[self.getSlicesFromIJKCoordinates(roiIJK)] = 1
 
             if listOfNodesWithOmitRegions:
                 for omitRegionNode in listOfNodesWithOmitRegions:
                     omitRegIJK = self.getBoxROIIJKCoordinates(omitRegionNode, tempReferenceVolumeNode)
-                    voi_mask[omitRegIJK['IJKmin'][2]:omitRegIJK['IJKmax'][2], omitRegIJK['IJKmin'][1]:omitRegIJK['IJKmax'][1], omitRegIJK['IJKmin'][0]:omitRegIJK['IJKmax'][0]] = 0
+                    voi_mask[self.getSlicesFromIJKCoordinates(omitRegIJK)] = 0
                     
             slicer.util.updateSegmentBinaryLabelmapFromArray(voi_mask, maskVolumeSegmentationNode, segmentNodeID)
             label = slicer.util.arrayFromSegmentBinaryLabelmap(maskVolumeSegmentationNode, segmentNodeID)
@@ -1598,44 +1847,31 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         croppingVolumes = True
         if croppingVolumes:
             # Crop the volumes using the ROI box:
-            # label = self.cropVolumeFromROI(label, referenceBoxROINode, tempReferenceVolumeNode)
-            # inputVolume4Darray = self.cropSequenceVolumeFromROI(inputVolume4Darray, referenceBoxROINode, tempReferenceVolumeNode)
-            inputVolume4Darray = inputVolume4Darray[:, roiIJK['IJKmin'][2]:roiIJK['IJKmax'][2], roiIJK['IJKmin'][1]:roiIJK['IJKmax'][1], roiIJK['IJKmin'][0]:roiIJK['IJKmax'][0]]
-            label = label[roiIJK['IJKmin'][2]:roiIJK['IJKmax'][2], roiIJK['IJKmin'][1]:roiIJK['IJKmax'][1], roiIJK['IJKmin'][0]:roiIJK['IJKmax'][0]]
-        
+            label = self.cropVolumeFromROI(label, referenceBoxROINode, tempReferenceVolumeNode, roiIJK)
+            inputVolume4Darray = self.cropSequenceVolumeFromROI(inputVolume4Darray, referenceBoxROINode, tempReferenceVolumeNode, roiIJK)
+
+        # The sequence is loaded in its native data type, but only the pre, early and late post-contrast volumes are needed
+        # for the PE and SER maps. Bind each of them as its own contiguous single precision volume (so the subtractions can't 
+        # overflow) instead of converting the whole (cropped) sequence:
         # Represent the data in terms of SER (S(t)/S0(t)). identifying S0 as the pre-contrast index:
-        St0 = inputVolume4Darray[preContrastIndex, :, :, :]
-        # JU - add variables denoting the matrix size as they will be useful later in the code
-        [nrows, ncols, ndepth] = St0.shape
+        St0 = np.ascontiguousarray(inputVolume4Darray[preContrastIndex, :, :, :], dtype=np.float32)
+        St1 = np.ascontiguousarray(inputVolume4Darray[earlyPostContrastIndex, :, :, :], dtype=np.float32)
+        Stn = np.ascontiguousarray(inputVolume4Darray[latePostContrastIndex, :, :, :], dtype=np.float32)
          
         # The background threshold is defined from the masked section only:
         bckgrnd_thresh = (BKGRNDthreshold/100.0) * np.percentile(St0, 95)
 
-        base_mask = (St0 >= bckgrnd_thresh) &  label
+        PE, SER, base_mask = self.computePESERMaps(St0, St1, Stn, label, bckgrnd_thresh, PEthreshold, serUpperThreshold)
+        del St1, Stn
 
-        St_minus_St0 = inputVolume4Darray - St0
-        
-        St1_minus_St0 = St_minus_St0[earlyPostContrastIndex, :, :, :]
-        Stn_minus_St0 = St_minus_St0[latePostContrastIndex, :, :, :]
-        
-        PE = 100 * St1_minus_St0 / ( St0 + self.EPSILON )
-        base_mask &= (PE >= PEthreshold)
-
-        PE = np.where(base_mask, PE, 0)
-        
-        PEmapTemplate[roiIJK['IJKmin'][2]:roiIJK['IJKmax'][2], roiIJK['IJKmin'][1]:roiIJK['IJKmax'][1], roiIJK['IJKmin'][0]:roiIJK['IJKmax'][0]] = PE
-
-        slicer.util.updateVolumeFromArray(tempPEVolumeNode, PEmapTemplate)
-        outputMapsSequenceNode.SetDataNodeAtValue(tempPEVolumeNode, "PE")
-        # Delete tempPEVolumeNode asap:
-        slicer.mrmlScene.RemoveNode(tempPEVolumeNode)
-        
-        SER = ( St1_minus_St0 / ( Stn_minus_St0 + self.EPSILON ) ) 
-        SER[SER < 0.0] = 0.0
-        SER[SER > serUpperThreshold] = 0.0
-        base_mask &= (SER >= 0.0)
+        # The full size maps are written straight into the voxels of the temporary volume, rather than into a full size array
+        # that is then copied into it. Single precision is plenty for the PE (%) map:
+        PEmapTemplate = self.getZeroedArrayFromVolume(tempReferenceVolumeNode, np.float32)
+        PEmapTemplate[self.getSlicesFromIJKCoordinates(roiIJK)] = PE
 
-        SER = np.where(base_mask, SER, 0)
+        slicer.util.arrayFromVolumeModified(tempReferenceVolumeNode)
+        tempReferenceVolumeNode.SetName("peMap")
+        outputMapsSequenceNode.SetDataNodeAtValue(tempReferenceVolumeNode, "PE")
                 
         # JU - This convolution defines the maximum over a neighbourhood. But, it is not what is suppossed to do, according to the 
         #       reference literature.
@@ -1649,83 +1885,80 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         # base_mask &= (convbrmask >= (100 + self.PIXEL_CONNECTIVITY))
 
         # Relevant for when adding a user-defined segmentation mask (e.g. Tumour_tissue)
-        seg_points = np.where(base_mask)
+        # Flat indices of the masked voxels, so the (contiguous) 3D maps are gathered/scattered with a single index array.
+        # The cropped sequence is a view that can't be flattened without a copy, so it is gathered with base_mask itself
+        # (same C order as seg_index)
+        seg_index = np.flatnonzero(base_mask)
 
-        SERmap = np.zeros_like(SER)
-        nLevels = len(serMapDictionary['levelThreshold']['UB'])
-        for idx, (lb, ub) in enumerate(zip(serMapDictionary['levelThreshold']['LB'], serMapDictionary['levelThreshold']['UB'])):
-            truth_table_indices = ( (SER > lb) & (SER <= ub) )
-            SERmap[truth_table_indices] = idx + 1
-            
-        # Add the last element of the interval that makes MaxSER < SER:
-        # JU 30/07/2024: How to deal with this if is NON-SER??
-        idx = nLevels
-        if idx == 0:
-            SERmap[SER > 0.0] = 1
-
-        SERmap *= base_mask
-        
-        SERmapTemplate[roiIJK['IJKmin'][2]:roiIJK['IJKmax'][2], roiIJK['IJKmin'][1]:roiIJK['IJKmax'][1], roiIJK['IJKmin'][0]:roiIJK['IJKmax'][0]] = SERmap
+        # Label only the voxels within the mask, everything else is non SER (i.e. 0). The labels are scattered straight into the
+        # ROI box of the (zero-filled) full size map, no need for an intermediate map of the box
+        # (the SER map only holds the few SER level labels)
+        SERmapTemplate = self.getZeroedArrayFromVolume(tempReferenceVolumeNode, np.uint8)
+        SERmapTemplate[self.getSlicesFromIJKCoordinates(roiIJK)][base_mask] = self.getSERLevelsLabelMap(np.take(SER, seg_index), 
+                                                                                                        serMapDictionary['levelThreshold'])
         
-        slicer.util.updateVolumeFromArray(tempSERVolumeNode, SERmapTemplate)
+        slicer.util.arrayFromVolumeModified(tempReferenceVolumeNode)
+        tempReferenceVolumeNode.SetName("serMap")
 
         volumes_logic = slicer.modules.volumes.logic()
-        volumes_logic.CreateLabelVolumeFromVolume(slicer.mrmlScene, outputLabelMapVolumeNode, tempSERVolumeNode)
+        volumes_logic.CreateLabelVolumeFromVolume(slicer.mrmlScene, outputLabelMapVolumeNode, tempReferenceVolumeNode)
         # Import label map into a segmentation:
         slicer.modules.segmentations.logic().ImportLabelmapToSegmentationNode(outputLabelMapVolumeNode, maskVolumeSegmentationNode)       
-        outputMapsSequenceNode.SetDataNodeAtValue(tempSERVolumeNode, "SER")
+        outputMapsSequenceNode.SetDataNodeAtValue(tempReferenceVolumeNode, "SER")
 
         # JU 27/09/2024 - Here we calculated the peak PE and SER. First, we find the mean over a 3x3x3 neighbourhood, 
         # and then get the max over them so we end up with a single value representing the peak PE and SER, 
         # respectively:
-        mean_conv = np.ones((3,3,3))
-        mean_conv /= mean_conv.sum()
-        meanSERmap = signal.convolve(SER, mean_conv, mode='same')
-        meanPEmap = signal.convolve(PE, mean_conv, mode='same')
-        # Note that the convolution method to average a neighbourhood considers the values 0 when averaging (i.e. a=[1,0,1] ==> avg(a)=2/3)
-        meanSERmap = meanSERmap[1:(nrows-np.mod(nrows,3)):3, 
-                                1:(ncols-np.mod(ncols,3)):3, 
-                                1:(ndepth-np.mod(ndepth,3)):3] # This retains only the average over the 3x3x3 sub-matrix (i.e. where the kernel fits complete in the volume)
-        meanPEmap = meanPEmap[1:(nrows-np.mod(nrows,3)):3, 
-                                1:(ncols-np.mod(ncols,3)):3, 
-                                1:(ndepth-np.mod(ndepth,3)):3]
-        peakSER = meanSERmap.max()
-        peakPE = meanPEmap.max()
+        # Note that, as with the previous convolution approach, the values outside the mask are 0 and count when averaging
+        # (i.e. a=[1,0,1] ==> avg(a)=2/3). Only the non-overlapping 3x3x3 sub-matrices that fit complete in the volume are used
+        peakSER = self.getPeakBlockMean(SER)
+        peakPE = self.getPeakBlockMean(PE)
         
 
         # FTV map label from SERmap:
-        mapVolumes = {'FTV': np.where(SERmap > serMapDictionary['SERthreshold'], 1.0, 0.0),
-                      'ETV': np.where(SERmap > 0, 1.0, 0.0) 
+        # (uint8 views of the boolean masks, the label maps don't need the float {0.0, 1.0} copies). They are taken from the 
+        # full size template, so they share the geometry of the SER map held by tempReferenceVolumeNode
+        mapVolumes = {'FTV': (SERmapTemplate > serMapDictionary['SERthreshold']).view(np.uint8),
+                      'ETV': (SERmapTemplate > 0).view(np.uint8) 
                       }
         mapStats = {}
         for mapNameID, mapVolume in mapVolumes.items():
-            labelMapVolumeNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLLabelMapVolumeNode", "mapLabel")
-            slicer.util.updateVolumeFromArray(tempSERVolumeNode, mapVolume)
-            volumes_logic.CreateLabelVolumeFromVolume(slicer.mrmlScene, labelMapVolumeNode, tempSERVolumeNode)
-            maskVolumeSegmentationNode.GetSegmentation().AddEmptySegment(mapNameID)
-            mapSegmentID = vtk.vtkStringArray()
-            mapSegmentID.InsertNextValue(mapNameID)
-            slicer.modules.segmentations.logic().ImportLabelmapToSegmentationNode(labelMapVolumeNode, maskVolumeSegmentationNode, mapSegmentID)
-            mapStats[mapNameID] = self.getStatsFromMask(maskVolumeSegmentationNode,
-                                                        mapNameID)
+            maskSegmentation.AddEmptySegment(mapNameID)
+            # Write the mask straight into the segment, no need for a temporary label map volume node:
+            slicer.util.updateSegmentBinaryLabelmapFromArray(mapVolume, maskVolumeSegmentationNode, mapNameID, tempReferenceVolumeNode)
+
+        # Statistics of all the segments (i.e. the user-defined mask, the SER levels, FTV and ETV) from a single pass:
+        allSegmentStats = self.getStatsFromAllSegments(maskVolumeSegmentationNode)
+        for mapNameID in mapVolumes:
+            # (an empty map may not have any statistics at all)
+            mapStats[mapNameID] = allSegmentStats.get(mapNameID, {})
             maskVolumeSegmentationNode.RemoveSegment(mapNameID)
-            slicer.mrmlScene.RemoveNode(labelMapVolumeNode)
-
-        slicer.mrmlScene.RemoveNode(tempSERVolumeNode)
 
         # JU - This operates over the Selected ROI (e.g. Tumour Tissue)
-        uptake_ti = 100 * St_minus_St0 / (St0 + self.EPSILON)
-        for time_index in range(nt):
-            ser_roi  = uptake_ti[time_index,:,:,:]
-            time_intensity_curve[time_index,1] =  ser_roi[seg_points].mean()
-
-        max_ENH = np.max(uptake_ti, axis=0)
-        delta_ENH = (uptake_ti[latePostContrastIndex,:,:,:] - uptake_ti[earlyPostContrastIndex,:,:,:])[seg_points]
-        first_pass_ENH = uptake_ti[earlyPostContrastIndex,:,:,:][seg_points]
-        [m_slope, n_coeff], time_intensity_curve[1:,2] = self.simple_linear_fit(time_intensity_curve[1:,0], time_intensity_curve[1:,1])
+        # Gather the ROI voxels of every time point at once (nt x number of voxels), so the uptake is only computed
+        # where it is used, then get all the metrics from them:
+        # uptake(t) = 100 * (S(t) - S0) / (S0 + EPSILON)
+        if seg_index.size == 0:
+            # No voxel passed the thresholds (e.g. the ROI misses the enhancing tissue), so there is no uptake to report:
+            # the TIC values keep their NaN initialisation, and so do the enhancement metrics
+            logging.warning('(process) No voxels within the mask passed the background and PE thresholds')
+            max_ENH = delta_ENH = first_pass_ENH = m_slope = np.nan
+        else:
+            St0_roi = np.take(St0, seg_index)
+            uptake_roi = inputVolume4Darray[:, base_mask].astype(np.float32)
+            uptake_roi -= St0_roi
+            uptake_roi *= 100
+            uptake_roi /= St0_roi + self.EPSILON
+            time_intensity_curve[:,1] = uptake_roi.mean(axis=1, dtype=np.float64)
+
+            # Only the mean over the ROI of each enhancement metric is reported:
+            max_ENH = np.max(uptake_roi, axis=0).mean()
+            delta_ENH = (uptake_roi[latePostContrastIndex] - uptake_roi[earlyPostContrastIndex]).mean()
+            first_pass_ENH = uptake_roi[earlyPostContrastIndex].mean()
+            [m_slope, n_coeff], time_intensity_curve[1:,2] = self.simple_linear_fit(time_intensity_curve[1:,0], time_intensity_curve[1:,1])
 
         # Statistics for the user-defined Segmentation mask
-        segmentStats = self.getStatsFromMask(maskVolumeSegmentationNode, segmentNodeID)
+        segmentStats = allSegmentStats[segmentNodeID]
         # # Segment Oriented Bounding Box Diameter 
         maxROIDiameter = {'name': 'ROI longest axis',
                             'value': np.max(segmentStats['obb_diameter_mm']['value']),
@@ -1735,17 +1968,18 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
         # The value returned by segmentStats is the enclosing box (Vol = prod(OBB_diameter)). 
         # To get the equivalent ellipsoidal volume, the formula is 4pi/3 * prod(OBB_radius)
         # Therefore, we need to multiply Vol by: (0.5)^3 * (4pi/3) (or simply pi/6.0)
-        ellipsoidScale = (1.0/6.0) * np.pi
         roiVolume = {'name': 'ROI Volume',
-                        'value': segmentStats['volume_cm3']['value'] * ellipsoidScale,
+                        'value': segmentStats['volume_cm3']['value'] * ELLIPSOID_SCALE,
                         'units': segmentStats['volume_cm3']['units']}
 
+        # Column names of the summary tables:
+        labelColumnName, statsColumnName, unitsColumnName = tableNodeDict['SummaryTable'][1]
+        nameColumnName, volumeColumnName, distColumnName = tableNodeDict['SERSummaryTable'][1]
+
         labelColumn = vtk.vtkStringArray()
-        labelColumn.SetName(tableNodeDict['SummaryTable'][1][0])
-        statsColumn = vtk.vtkDoubleArray()
-        statsColumn.SetName(tableNodeDict['SummaryTable'][1][1])
+        labelColumn.SetName(labelColumnName)
         unitsColumn = vtk.vtkStringArray()
-        unitsColumn.SetName(tableNodeDict['SummaryTable'][1][2])
+        unitsColumn.SetName(unitsColumnName)
 
         # Add stats to Summary Table:
         # JU 27/09/2024  - Add the peak PE and SER values at the begining of the table
@@ -1772,9 +2006,9 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
                               timings['injectionTime']/(1000*60),
                               time_intensity_curve[earlyPostContrastIndex, 0],
                               time_intensity_curve[latePostContrastIndex, 0],
-                              max_ENH[seg_points].mean(), 
-                              delta_ENH.mean(), 
-                              first_pass_ENH.mean(), 
+                              max_ENH, 
+                              delta_ENH, 
+                              first_pass_ENH, 
                               m_slope]
 
         unitsColumnContent = ['[]',
@@ -1791,63 +2025,79 @@ class quantificationLogic(ScriptedLoadableModuleLogic):
                               '%', 
                               '[]']
 
-        for rows in zip(labelColumnContent, statsColumnContent, unitsColumnContent):
-            labelColumn.InsertNextValue(rows[0])
-            statsColumn.InsertNextValue(rows[1])
-            unitsColumn.InsertNextValue(rows[2])
+        # The numeric column is copied in one go from numpy, the string columns are sized once and then set in place:
+        statsColumn = numpy_to_vtk(np.asarray(statsColumnContent, dtype=np.float64), deep=True)
+        statsColumn.SetName(statsColumnName)
+        for column in (labelColumn, unitsColumn):
+            column.SetNumberOfValues(len(labelColumnContent))
+        for idx, rows in enumerate(zip(labelColumnContent, unitsColumnContent)):
+            labelColumn.SetValue(idx, rows[0])
+            unitsColumn.SetValue(idx, rows[1])
 
         # Statistics for the SER Label Maps:
         nameColumn = vtk.vtkStringArray()
-        nameColumn.SetName(tableNodeDict['SERSummaryTable'][1][0])
-        volumeColumn = vtk.vtkDoubleArray()
-        volumeColumn.SetName(tableNodeDict['SERSummaryTable'][1][1])
-        distColumn = vtk.vtkDoubleArray()
-        distColumn.SetName(tableNodeDict['SERSummaryTable'][1][2])
+        nameColumn.SetName(nameColumnName)
 
         # Iterate over the segmentation mask and get statistics for each SER label:
-        maskSegmentations = maskVolumeSegmentationNode.GetSegmentation()
-        FTVstats = [mapStats['FTV']['volume_cm3']['value'], mapStats['FTV']['voxel_count']['value']]
-        ETVstats = [mapStats['ETV']['volume_cm3']['value'], mapStats['ETV']['voxel_count']['value']]
+        FTVstats = [mapStats['FTV'].get(statName, {}).get('value', np.nan) for statName in ('volume_cm3', 'voxel_count')]
+        ETVstats = [mapStats['ETV'].get(statName, {}).get('value', np.nan) for statName in ('volume_cm3', 'voxel_count')]
+        # With no enhanced voxels (e.g. none passed the thresholds) the ETV is empty, so there is no distribution to report:
+        # the SER, FTV and ETV rows are left as NaN
+        hasEnhancedVoxels = (not np.isnan(ETVstats[1])) and (ETVstats[1] > 0)
+        if not hasEnhancedVoxels:
+            logging.warning('(process) The ETV is empty, the SER distribution is not computed')
         
         # Skip 'non SER' from legends
         SERauxList = serMapDictionary['legend'].copy()
         SERauxList.pop(SERauxList.index('non SER'))
-        SERlegendCheck = [True]*len(SERauxList)
-
-        for segment_iID in maskSegmentations.GetSegmentIDs():
-            segmentName = maskSegmentation.GetSegment(segment_iID).GetName() #?
-            if segmentName in SERauxList:
-                segmentPos = SERauxList.index(segmentName)
-                segmentStats = self.getStatsFromMask(maskVolumeSegmentationNode, segment_iID)
-                nameColumn.InsertValue(segmentPos, segmentName)
-                volumeColumn.InsertValue(segmentPos, np.round(segmentStats['volume_cm3']['value'],3))
-                distColumn.InsertValue(segmentPos, np.round(100 * segmentStats['voxel_count']['value'] / ETVstats[1], 2))
-                SERlegendCheck[segmentPos] = False
-                
-        for idx in range(len(SERauxList)):
-            if SERlegendCheck[idx] :
-                nameColumn.InsertValue(idx, SERauxList[idx])
-                volumeColumn.InsertValue(idx, np.nan)
-                distColumn.InsertValue(idx, np.nan)
+        # Position of each SER legend in the table, so each segment name is looked up only once:
+        SERlegendPosition = {legend: pos for pos, legend in enumerate(SERauxList)}
+        # One row per SER legend, plus the FTV and ETV rows at the end. The rows names are the legends themselves, and the 
+        # numeric values are collected in numpy arrays (NaN for the SER levels without a segment) and copied into the VTK 
+        # columns at the end:
+        nameColumn.SetNumberOfValues(len(SERauxList) + 2)
+        for idx, legend in enumerate(SERauxList):
+            nameColumn.SetValue(idx, legend)
+        volumeValues = np.full(len(SERauxList) + 2, np.nan)
+        distValues = np.full(len(SERauxList) + 2, np.nan)
+
+        for segment_iID in (maskSegmentation.GetSegmentIDs() if hasEnhancedVoxels else ()):
+            segmentName = maskSegmentation.GetSegment(segment_iID).GetName()
+            segmentPos = SERlegendPosition.get(segmentName)
+            if segmentPos is not None:
+                segmentStats = allSegmentStats[segment_iID]
+                volumeValues[segmentPos] = np.round(segmentStats['volume_cm3']['value'],3)
+                distValues[segmentPos] = np.round(100 * segmentStats['voxel_count']['value'] / ETVstats[1], 2)
         
         # Append the FTV and ETV stats at the end of list
-        nameColumn.InsertNextValue('FTV (Functional Tumour Volume)')
-        volumeColumn.InsertNextValue(np.round(FTVstats[0],3))
-        distColumn.InsertNextValue(np.round(100 * FTVstats[1]/ETVstats[1], 2))
-
-        nameColumn.InsertNextValue('ETV (Enhanced Tumour Volume)')
-        volumeColumn.InsertNextValue(np.round(ETVstats[0],3))
-        distColumn.InsertNextValue(np.round(100.0, 2))
+        FTVrow = len(SERauxList)
+        nameColumn.SetValue(FTVrow, 'FTV (Functional Tumour Volume)')
+        ETVrow = FTVrow + 1
+        nameColumn.SetValue(ETVrow, 'ETV (Enhanced Tumour Volume)')
+
+        if hasEnhancedVoxels:
+            volumeValues[FTVrow] = np.round(FTVstats[0],3)
+            distValues[FTVrow] = np.round(100 * FTVstats[1]/ETVstats[1], 2)
+            volumeValues[ETVrow] = np.round(ETVstats[0],3)
+            distValues[ETVrow] = np.round(100.0, 2)
+
+        volumeColumn = numpy_to_vtk(volumeValues, deep=True)
+        volumeColumn.SetName(volumeColumnName)
+        distColumn = numpy_to_vtk(distValues, deep=True)
+        distColumn.SetName(distColumnName)
         
         # JU - Update table and plot - TODO: I think this should be moved to a different function
         slicer.util.updateTableFromArray(tableNodeDict['TICTable'][0], time_intensity_curve, tableNodeDict['TICTable'][1])
 
-        tableNodeDict['SummaryTable'][0].AddColumn(labelColumn)
-        tableNodeDict['SummaryTable'][0].AddColumn(statsColumn)
-        tableNodeDict['SummaryTable'][0].AddColumn(unitsColumn)
-        tableNodeDict['SERSummaryTable'][0].AddColumn(nameColumn)
-        tableNodeDict['SERSummaryTable'][0].AddColumn(volumeColumn)
-        tableNodeDict['SERSummaryTable'][0].AddColumn(distColumn)
+        # Add all the columns of each table under a single modification, so the table views are refreshed only once:
+        with slicer.util.NodeModify(tableNodeDict['SummaryTable'][0]):
+            tableNodeDict['SummaryTable'][0].AddColumn(labelColumn)
+            tableNodeDict['SummaryTable'][0].AddColumn(statsColumn)
+            tableNodeDict['SummaryTable'][0].AddColumn(unitsColumn)
+        with slicer.util.NodeModify(tableNodeDict['SERSummaryTable'][0]):
+            tableNodeDict['SERSummaryTable'][0].AddColumn(nameColumn)
+            tableNodeDict['SERSummaryTable'][0].AddColumn(volumeColumn)
+            tableNodeDict['SERSummaryTable'][0].AddColumn(distColumn)
 
         # Update viewer with results:
         updatedSequenceBrowserNode = self.findBrowserForSequence(outputMapsSequenceNode)